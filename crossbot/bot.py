@@ -2,16 +2,21 @@
 This module contains various handlers for the bot as well as the initialization function
 """
 from enum import IntEnum, auto
+from html import escape
 import logging
 import random
 import sys
 import traceback
+import tracemalloc
 
 from telegram import InputMediaPhoto, ParseMode
+from telegram.error import BadRequest, TelegramError
 from telegram.ext import Filters, Updater, CommandHandler, ConversationHandler, MessageHandler
+from telegram.ext.dispatcher import run_async
 from telegram.utils.helpers import mention_html
 
 from crossbot.crossword import Crossword
+import crossbot.diagnostics as diagnostics
 import crossbot.settings as settings
 
 
@@ -64,20 +69,43 @@ def on_new_crossword(update, context):
     """
     chat_id = update.message.chat_id
     context.bot.send_message(chat_id=chat_id, text=settings.LOADING_MSG)
+    question_msg = None
+
+    def send_questions(cwrd, template=settings.QUESTIONS_LOADING_TEMPLATE_MSG):
+        # questions go out before the grid is ready; a failed attempt rewrites the same message
+        nonlocal question_msg
+        text = template.format(*cwrd.list_unattempted_questions())
+        if question_msg is not None:
+            try:
+                question_msg = context.bot.edit_message_text(
+                    text,
+                    chat_id=chat_id,
+                    message_id=question_msg.message_id,
+                    parse_mode=ParseMode.HTML,
+                )
+                return
+            except BadRequest:
+                # the previous list was deleted or cannot be edited, post a new one
+                pass
+        question_msg = context.bot.send_message(
+            chat_id=chat_id,
+            text=text,
+            parse_mode=ParseMode.HTML,
+        )
+
     is_created = False
     while not is_created:
         try:
-            cwrd = Crossword(random.randint(1, settings.MAX_CROSSWORD_ID))
+            cwrd = Crossword(random.randint(1, settings.MAX_CROSSWORD_ID), on_questions=send_questions)
+        except TelegramError:
+            # only crossword loading failures are retried, the rest goes to on_error
+            raise
         except Exception:
             continue
         is_created = True
     context.chat_data[StoredValue.CROSSWORD_STATE] = cwrd
+    send_questions(cwrd, settings.QUESTIONS_TEMPLATE_MSG)
     context.bot.send_message(chat_id=chat_id, text=settings.READY_MSG)
-    question_msg = context.bot.send_message(
-        chat_id=chat_id,
-        text=settings.QUESTIONS_TEMPLATE_MSG.format(*cwrd.list_unattempted_questions()),
-        parse_mode=ParseMode.HTML,
-    )
     cwrd_msg = update.message.reply_photo(photo=cwrd.cur_state())
     context.chat_data[StoredValue.CROSSWORD_MSG_ID] = cwrd_msg.message_id
     context.chat_data[StoredValue.QUESTION_MSG_ID] = question_msg.message_id
@@ -176,6 +204,69 @@ def on_cancel(update, context):
     update.message.reply_text(settings.CANCEL_MSG)
     return ConversationHandler.END
 
+@run_async
+def on_profile(update, context):
+    """
+    Samples the dispatcher threads for a few seconds and replies with the hottest frames
+    """
+    duration = settings.PROFILE_DURATION
+    if context.args and context.args[0].isdecimal():
+        duration = min(int(context.args[0]), settings.PROFILE_MAX_DURATION)
+    counts, rounds = diagnostics.sample_threads(
+        duration, settings.PROFILE_INTERVAL, settings.PROFILE_STACK_DEPTH
+    )
+    lines = []
+    for stack, samples in counts[:settings.PROFILE_TOP]:
+        lines.append(f"{samples:>5} {escape(stack[0])}")
+        lines.extend(f"      {escape(location)}" for location in stack[1:])
+    body = "\n".join(lines) or "no busy threads"
+    update.message.reply_html(
+        f"Sampled dispatcher and loader threads {rounds} times over {duration}s:\n\n"
+        f"<pre>{body}</pre>"
+    )
+
+def on_memtop(update, context):
+    """
+    Replies with the top allocation sites, starts or stops tracemalloc on demand
+    """
+    if context.args and context.args[0] == "stop":
+        tracemalloc.stop()
+        update.message.reply_text("tracemalloc stopped")
+        return
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(settings.TRACEMALLOC_FRAMES)
+        update.message.reply_text("tracemalloc started, run /memtop again later")
+        return
+    stats = diagnostics.top_allocations(settings.MEMTOP_LIMIT)
+    current, peak = tracemalloc.get_traced_memory()
+    lines = [escape(str(stat)) for stat in stats]
+    body = "\n".join(lines) or "no allocations"
+    update.message.reply_html(
+        f"Traced {current // 1024} KiB, peak {peak // 1024} KiB:\n\n"
+        f"<pre>{body}</pre>"
+    )
+
+def on_chatmem(update, context):
+    """
+    Replies with the memory footprint of the stored chat data
+    """
+    footprints = diagnostics.chat_footprints(context.dispatcher.chat_data)
+    total = sum(size for _, size in footprints)
+    lines = [f"{chat_id:>15} {size // 1024:>7} KiB" for chat_id, size in footprints[:settings.CHATMEM_TOP]]
+    body = "\n".join(lines) or "no chat data"
+    update.message.reply_html(
+        f"{len(footprints)} chats hold {total // 1024} KiB:\n\n"
+        f"<pre>{body}</pre>"
+    )
+
+def on_queues(update, context):
+    """
+    Replies with the current queue depths
+    """
+    depths = diagnostics.queue_depths(context.dispatcher)
+    lines = [f"{name:>8} {depth}" for name, depth in depths.items()]
+    update.message.reply_html("<pre>{}</pre>".format("\n".join(lines)))
+
 def prepare_updater():
     """
     Sets up the bot
@@ -184,6 +275,12 @@ def prepare_updater():
     dispatcher = updater.dispatcher
 
     dispatcher.add_handler(CommandHandler("start", on_start))
+
+    admin_filter = Filters.user(user_id=settings.ADMINS)
+    dispatcher.add_handler(CommandHandler("profile", on_profile, filters=admin_filter))
+    dispatcher.add_handler(CommandHandler("memtop", on_memtop, filters=admin_filter))
+    dispatcher.add_handler(CommandHandler("chatmem", on_chatmem, filters=admin_filter))
+    dispatcher.add_handler(CommandHandler("queues", on_queues, filters=admin_filter))
     dispatcher.add_handler(ConversationHandler(
         entry_points=[
             CommandHandler("newcrossword", on_new_crossword),
@@ -1,9 +1,11 @@
 """
 Pulls crossword data from https://absite.ru/crossw/
 """
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 import logging
 from random import randint
+import threading
 
 from bs4 import BeautifulSoup
 import cv2
@@ -19,6 +21,11 @@ import crossbot.settings as settings
 
 logger = logging.getLogger(__name__)
 
+_loader = ThreadPoolExecutor(
+    max_workers=settings.CROSSWORD_LOADER_WORKERS,
+    thread_name_prefix=settings.CROSSWORD_LOADER_THREAD_PREFIX,
+)
+
 
 class ParseException(Exception):
     pass
@@ -58,15 +65,28 @@ class Crossword:
         def __str__(self):
             return self.symbol if self.symbol else ' '
 
-    def __init__(self, cw_id):
+    def __init__(self, cw_id, on_questions=None):
+        """
+        Loads the picture and analyses the grid in the background while questions are parsed.
+        on_questions is called with the crossword as soon as the questions are available
+        """
         self.id = cw_id
         self.qs = dict()
         self.grid = None
         self.orig_im = None
+        self._cancelled = threading.Event()
 
-        self._load_questions()
-        self._get_img()
-        self._prep_img()
+        grid_task = _loader.submit(self._load_grid)
+        try:
+            self._load_questions()
+            if on_questions is not None:
+                on_questions(self)
+            numbered_cells = grid_task.result(timeout=settings.CROSSWORD_LOAD_TIMEOUT)
+        except Exception:
+            self._cancelled.set()
+            grid_task.cancel()
+            raise
+        self._place_questions(numbered_cells)
 
         self._validate()
 
@@ -111,16 +131,27 @@ class Crossword:
 
     def _get_img(self):
         print_link = f"https://absite.ru/crossw/{self.id}_pic.html"
-        resp = requests.get(print_link)
+        resp = requests.get(print_link, timeout=settings.REQUEST_TIMEOUT)
         if resp.status_code != 200:
             raise requests.RequestException("Unable to load: {}".format(resp.status_code))
         soup = BeautifulSoup(resp.text, "html.parser")
         img = soup.find("img")
         img_link = "https://absite.ru/crossw/" + img.attrs["src"]
-        self.orig_im = io.imread(img_link)
+        if self._cancelled.is_set():
+            return
+        resp = requests.get(img_link, timeout=settings.REQUEST_TIMEOUT)
+        if resp.status_code != 200:
+            raise requests.RequestException("Unable to load: {}".format(resp.status_code))
+        self.orig_im = io.imread(BytesIO(resp.content))
+
+    def _load_grid(self):
+        self._get_img()
+        if self._cancelled.is_set():
+            return None
+        return self._prep_img()
 
     def _load_questions(self):
-        resp = requests.get("https://absite.ru/crossw/{}.html".format(self.id))
+        resp = requests.get("https://absite.ru/crossw/{}.html".format(self.id), timeout=settings.REQUEST_TIMEOUT)
         if resp.status_code != 200:
             raise requests.RequestException("Unable to load: {}".format(resp.status_code))
         soup = BeautifulSoup(resp.text, "html.parser")
@@ -144,7 +175,14 @@ class Crossword:
             self.grid[x][y].center = center
         return row_mask, col_mask
 
+    def _place_questions(self, numbered_cells):
+        for _, q in self.qs.items():
+            q.start_cell = numbered_cells.get(q.id)
+
     def _prep_img(self):
+        """
+        Builds the grid and returns grid coordinates of the numbered cells
+        """
         orig = self.orig_im.copy()
         gray = cv2.cvtColor(orig, cv2.COLOR_BGR2GRAY)
         gray[np.logical_and(gray != 0, gray != 255)] = 0
@@ -159,6 +197,8 @@ class Crossword:
 
         row_mask, col_mask = self._prepare_grid(internal)
 
+        numbered_cells = dict()
+
         cnts, _ = cv2.findContours(internal.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         for cnt in cnts:
             (x, y, w, h) = cv2.boundingRect(cnt)
@@ -197,11 +237,9 @@ class Crossword:
                 digit = inv_cell[d_y:d_y + d_h, d_x:d_x + d_w]
                 value = img_to_number(digit)
                 cell_num = cell_num * 10 + value
-            for direction in ["H", "V"]:
-                if self.qs.get(direction + str(cell_num)) is not None:
-                    center = contour_center(cnt)
-                    grid_coords = point_to_grid_coords(center, row_mask, col_mask)
-                    self.qs[direction + str(cell_num)].start_cell = grid_coords
+            center = contour_center(cnt)
+            numbered_cells[str(cell_num)] = point_to_grid_coords(center, row_mask, col_mask)
+        return numbered_cells
 
     def _validate(self):
         for _, q in self.qs.items():
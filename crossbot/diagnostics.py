@@ -0,0 +1,122 @@
+"""
+This module contains runtime diagnostics used by the admin commands
+"""
+from collections import Counter
+from enum import Enum
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+import crossbot.settings as settings
+
+
+def _is_bot_thread(thread):
+    return (
+        ":dispatcher" in thread.name or ":worker:" in thread.name
+        or thread.name.startswith(settings.CROSSWORD_LOADER_THREAD_PREFIX)
+    )
+
+def _is_idle(frame):
+    code = frame.f_code
+    if code.co_name == "_worker" and code.co_filename.endswith(os.path.join("concurrent", "futures", "thread.py")):
+        # idle pool workers block inside the C implemented SimpleQueue.get
+        return True
+    while frame is not None:
+        if frame.f_code.co_name == "get" and os.path.basename(frame.f_code.co_filename) == "queue.py":
+            return True
+        frame = frame.f_back
+    return False
+
+def _stack(frame, depth):
+    stack = []
+    while frame is not None and len(stack) < depth:
+        code = frame.f_code
+        stack.append(f"{os.path.basename(code.co_filename)}:{frame.f_lineno} ({code.co_name})")
+        frame = frame.f_back
+    return tuple(stack)
+
+def sample_threads(duration, interval, depth):
+    """
+    Samples the stacks of the busy dispatcher and crossword loader threads,
+    threads waiting on a queue are skipped.
+    Returns a list of (stack, samples) pairs with stacks listed innermost frame first
+    and the number of sampling rounds
+    """
+    own_ident = threading.get_ident()
+    counts = Counter()
+    rounds = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        names = {
+            thread.ident: thread.name for thread in threading.enumerate()
+            if thread.ident != own_ident and _is_bot_thread(thread)
+        }
+        for ident, frame in sys._current_frames().items():
+            if ident not in names or _is_idle(frame):
+                continue
+            counts[_stack(frame, depth)] += 1
+        rounds += 1
+        time.sleep(interval)
+    return counts.most_common(), rounds
+
+def top_allocations(limit):
+    """
+    Returns the top allocation sites from the current tracemalloc snapshot
+    """
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ])
+    return snapshot.statistics("lineno")[:limit]
+
+def deep_sizeof(obj, seen=None):
+    """
+    Approximates the memory used by an object together with everything it references
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, type):
+        return 0
+    size = sys.getsizeof(obj)
+    if isinstance(obj, np.ndarray):
+        # getsizeof counts the data buffer only when the array owns it
+        if not obj.flags.owndata:
+            size += obj.nbytes
+    elif isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, Enum):
+        # enum members are shared singletons, their attributes lead to the enum class
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+def chat_footprints(chat_data):
+    """
+    Returns (chat_id, bytes) pairs for every chat with stored data, largest first
+    """
+    footprints = [
+        (chat_id, deep_sizeof(data)) for chat_id, data in list(chat_data.items()) if data
+    ]
+    return sorted(footprints, key=lambda x: x[1], reverse=True)
+
+def queue_depths(dispatcher):
+    """
+    Returns the number of pending items in the dispatcher queues
+    """
+    depths = {"updates": dispatcher.update_queue.qsize()}
+    # python-telegram-bot has no public accessors for these queues, hence the private attributes
+    async_queue = getattr(dispatcher, "_Dispatcher__async_queue", None)
+    if async_queue is not None:
+        depths["async"] = async_queue.qsize()
+    job_queue = getattr(dispatcher.job_queue, "_queue", None)
+    if job_queue is not None:
+        depths["jobs"] = job_queue.qsize()
+    return depths
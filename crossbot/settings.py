@@ -16,9 +16,21 @@ TG_TOKEN = getenv("TG_TOKEN")
 # Constants
 CROSSWORD_TIMEOUT = 25 * 60
 MAX_CROSSWORD_ID = 5000
+CROSSWORD_LOADER_WORKERS = 4
+CROSSWORD_LOADER_THREAD_PREFIX = "crossword-loader"
+CROSSWORD_LOAD_TIMEOUT = 60
+REQUEST_TIMEOUT = 10
 ADMINS = [
     296877123,
 ]
+PROFILE_DURATION = 5
+PROFILE_MAX_DURATION = 60
+PROFILE_INTERVAL = 0.01
+PROFILE_TOP = 5
+PROFILE_STACK_DEPTH = 8
+MEMTOP_LIMIT = 10
+TRACEMALLOC_FRAMES = 1
+CHATMEM_TOP = 15
 NUMBER_TEMPLATES = [
     [[0, 1, 1, 0], [1, 0, 0, 1], [1, 0, 0, 1], [1, 0, 0, 1], [1, 0, 0, 1], [1, 0, 0, 1], [1, 1, 1, 0]],  # 0
     [[0, 1]      , [1, 1]      , [0, 1]      , [0, 1]      , [0, 1]      , [0, 1]      , [0, 1]      ],  # 1
@@ -71,6 +83,10 @@ QUESTIONS_TEMPLATE_MSG = (
     "<b>По горизонали:</b>\n"
     "{}"
 )
+QUESTIONS_LOADING_TEMPLATE_MSG = (
+    u"<i>Сетка кроссворда еще загружается, вопросы могут измениться.</i>\n\n"
+    + QUESTIONS_TEMPLATE_MSG
+)
 ANSWER_TOO_LONG_MSG = (
     u"Ответ слишком длинный. Стоит попробовать что-нибудь другое"
 )